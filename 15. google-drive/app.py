@@ -1,12 +1,50 @@
 import streamlit as st
-from g_drive_service import GoogleDriveService
+from g_drive_service import get_drive_service, authorized_http
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-from googleapiclient.http import MediaIoBaseDownload
+from openpyxl import load_workbook
+from pathlib import Path
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import io
 
+# Engine de leitura do Excel: calamine (Rust) é bem mais rápido e usa menos memória;
+# se não estiver instalado, usa o openpyxl (que o pandas já abre em modo read-only)
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+# Acima deste tamanho estimado (linhas x colunas x 8 bytes) a planilha é lida em blocos
+MAX_IN_MEMORY_BYTES = 512 * 1024 * 1024
+
+# Diretório onde as planilhas convertidas para Parquet são guardadas
+PARQUET_CACHE_DIR = Path(tempfile.gettempdir()) / "gdrive_parquet"
+
+# Diretório com os arquivos baixados do Drive (mantido entre reinicializações do app)
+GDRIVE_CACHE_DIR = Path(".gdrive_cache")
+
+# Visões do app (a visão ativa fica em st.session_state.active_view)
+FILES_VIEW = "📁 Arquivos Excel"
+DATA_VIEW = "📊 Visualização de Dados"
+
+# Número de arquivos baixados e lidos em paralelo
+MAX_DOWNLOAD_WORKERS = 8
+
+# Limites de linhas enviadas ao navegador nos gráficos
+PLOT_MAX_ROWS = 50_000
+SCATTER_MAX_POINTS = 20_000
+
+# Arquivos até este tamanho são baixados em uma única requisição
+SINGLE_REQUEST_MAX_BYTES = 5 * 1024 * 1024
+
+# Tamanho de cada parte nos downloads maiores (o padrão da biblioteca é 100 KB)
+DOWNLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+
 st.set_page_config(page_title="Google Drive Explorer", layout="wide")
 st.title("🗂️ Google Drive Explorer")
 st.write("Aplicativo para visualizar e baixar arquivos Excel (.xlsx) do Google Drive via API")
@@ -19,8 +57,8 @@ def getFileListFromGDrive():
     Returns:
         dict: Dicionário contendo a lista de arquivos
     """
-    selected_fields = "files(id, name, mimeType, webViewLink, createdTime, modifiedTime, size)"
-    g_drive_service = GoogleDriveService().build()
+    selected_fields = "files(id, name, mimeType, webViewLink, createdTime, modifiedTime, size, md5Checksum)"
+    g_drive_service = get_drive_service()
     
     try:
         # Query para filtrar apenas arquivos .xlsx
@@ -29,122 +67,727 @@ def getFileListFromGDrive():
             fields=selected_fields,
             pageSize=100,
             q=query
-        ).execute()
+        ).execute(http=authorized_http())  # Cliente próprio: o Http do serviço em cache não é thread-safe
         return {"files": list_file.get("files", [])}
     except Exception as e:
         st.error(f"Erro ao acessar o Google Drive: {e}")
         return {"files": []}
 
+def _cache_path(file_id, modified_time, md5_checksum):
+    """
+    Caminho do arquivo baixado no cache em disco para uma versão do arquivo no Drive
+    """
+    version = hashlib.md5(f"{modified_time}_{md5_checksum}".encode()).hexdigest()
+    return GDRIVE_CACHE_DIR / f"{file_id}_{version}.bin"
+
 @st.cache_data(ttl=3600)  # Cache por 1 hora
-def download_file(file_id, file_name):
+def download_file(file_id, file_name, modified_time=None, md5_checksum=None, file_size=None):
     """
     Baixa um arquivo do Google Drive.
     
+    Quando a versão do arquivo é informada (data de modificação e/ou checksum), o conteúdo
+    é guardado em disco e reaproveitado enquanto o arquivo não mudar no Drive.
+    
     Args:
         file_id (str): ID do arquivo no Google Drive
         file_name (str): Nome do arquivo
+        modified_time (str, optional): Data de modificação do arquivo no Google Drive
+        md5_checksum (str, optional): Checksum MD5 do arquivo no Google Drive
+        file_size (int, optional): Tamanho do arquivo em bytes; arquivos pequenos são baixados
+            em uma única requisição
         
     Returns:
         BytesIO: Conteúdo do arquivo em memória
     """
+    # Importado apenas quando um download é necessário
+    from googleapiclient.http import MediaIoBaseDownload
+    
+    cache_path = None
+    if modified_time or md5_checksum:
+        cache_path = _cache_path(file_id, modified_time, md5_checksum)
+        if cache_path.exists():
+            return io.BytesIO(cache_path.read_bytes())
+    
     try:
-        g_drive_service = GoogleDriveService().build()
+        g_drive_service = get_drive_service()
         request = g_drive_service.files().get_media(fileId=file_id)
+        request.http = authorized_http()
         
-        file = io.BytesIO()
-        downloader = MediaIoBaseDownload(file, request)
-        
-        done = False
-        with st.spinner(f"Baixando {file_name}..."):
+        if pd.notna(file_size) and file_size <= SINGLE_REQUEST_MAX_BYTES:
+            # Arquivo pequeno: uma única requisição, sem download em partes
+            with st.spinner(f"Baixando {file_name}..."):
+                file = io.BytesIO(request.execute())
+        else:
+            file = io.BytesIO()
+            downloader = MediaIoBaseDownload(file, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+            
+            progress_bar = st.progress(0.0, text=f"Baixando {file_name}...")
+            done = False
             while not done:
                 status, done = downloader.next_chunk()
+                if status:
+                    progress_bar.progress(status.progress(), text=f"Baixando {file_name}...")
+            progress_bar.empty()
                 
         file.seek(0)
-        return file
     except Exception as e:
         st.error(f"Erro ao baixar arquivo: {e}")
         return None
+    
+    if cache_path is not None:
+        try:
+            GDRIVE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Escreve em um arquivo temporário exclusivo para nunca deixar um download incompleto no cache
+            with tempfile.NamedTemporaryFile(dir=GDRIVE_CACHE_DIR, suffix=".tmp", delete=False) as tmp_file:
+                tmp_path = Path(tmp_file.name)
+                try:
+                    tmp_file.write(file.getvalue())
+                except OSError:
+                    tmp_file.close()
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+            tmp_path.replace(cache_path)
+            
+            # Remove as versões anteriores do mesmo arquivo
+            for old_path in GDRIVE_CACHE_DIR.glob(f"{file_id}_*.bin"):
+                if old_path != cache_path and old_path.stem.rsplit("_", 1)[0] == file_id:
+                    old_path.unlink(missing_ok=True)
+        except OSError as e:
+            st.warning(f"Não foi possível salvar {file_name} no cache em disco: {e}")
+    
+    return file
+
+# Tipos inferidos na amostra -> dtype usado na leitura completa
+# (tipos "nullable" evitam converter colunas inteiras com valores vazios para float64)
+PROBE_DTYPES = {
+    "integer": "Int64",
+    "boolean": "boolean",
+    "string": "string",
+}
 
 @st.cache_data(ttl=3600)  # Cache por 1 hora
-def read_file_to_dataframe(file_content, file_name):
+def probe_excel_columns(file_id, modified_time, file_name, _file_content, nrows=200):
+    """
+    Lê as primeiras linhas de cada aba para descobrir as colunas e inferir seus tipos
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        file_name (str): Nome do arquivo
+        _file_content (BytesIO): Conteúdo do arquivo (não entra na chave do cache)
+        nrows (int): Número de linhas usadas na amostra
+        
+    Returns:
+        tuple: Lista de colunas (na ordem do arquivo) e dicionário {coluna: dtype}
+    """
+    try:
+        # O openpyxl (modo read-only) para de ler após nrows; o calamine leria a aba inteira
+        probe = pd.read_excel(_file_content, sheet_name=None, nrows=nrows, engine="openpyxl")
+    except Exception as e:
+        st.error(f"Erro ao ler o arquivo {file_name}: {e}")
+        return [], {}
+    
+    columns = []
+    dtypes = {}
+    conflicts = set()
+    for sheet_df in probe.values():
+        for col in sheet_df.columns:
+            if col not in columns:
+                columns.append(col)
+            dtype = PROBE_DTYPES.get(pd.api.types.infer_dtype(sheet_df[col], skipna=True))
+            # Mesma coluna com tipos diferentes entre abas: deixa o pandas decidir
+            if col in dtypes and dtypes[col] != dtype:
+                conflicts.add(col)
+            dtypes[col] = dtype
+    
+    dtypes = {col: dtype for col, dtype in dtypes.items() if dtype and col not in conflicts}
+    return columns, dtypes
+
+def read_file_to_dataframe(file_content, file_name, dtype=None):
     """
     Converte o conteúdo do arquivo Excel em um DataFrame
+    (sem cache próprio: o resultado já é guardado por convert_to_parquet)
     
     Args:
         file_content (BytesIO): Conteúdo do arquivo
         file_name (str): Nome do arquivo
+        dtype (dict, optional): Tipos das colunas, ex.: obtidos com probe_excel_columns
         
     Returns:
         pd.DataFrame: DataFrame com os dados do arquivo
     """
     try:
-        # Para arquivos Excel, podemos tentar ler múltiplas abas
-        excel_file = pd.ExcelFile(file_content)
-        sheet_names = excel_file.sheet_names
+        try:
+            # Lê todas as abas de uma só vez (a planilha é processada apenas uma vez)
+            dataframes = pd.read_excel(
+                file_content, sheet_name=None, engine=EXCEL_ENGINE, dtype=dtype
+            )
+        except (ValueError, TypeError):
+            if not dtype:
+                raise
+            # A amostra não representou bem os dados: lê novamente sem os tipos
+            dataframes = pd.read_excel(file_content, sheet_name=None, engine=EXCEL_ENGINE)
         
         # Se tiver múltiplas abas, retorna um dicionário com um DataFrame para cada aba
-        if len(sheet_names) > 1:
-            dataframes = {}
-            for sheet in sheet_names:
-                dataframes[sheet] = pd.read_excel(file_content, sheet_name=sheet)
+        if len(dataframes) > 1:
             return dataframes
         else:
-            return pd.read_excel(file_content)
+            return next(iter(dataframes.values()))
     except Exception as e:
         st.error(f"Erro ao ler o arquivo {file_name}: {e}")
         return None
 
-def generate_metrics(df):
+def optimize_dtypes(df):
+    """
+    Reduz o uso de memória do DataFrame: números com o menor tipo possível e
+    colunas de texto com poucos valores distintos como category
+    
+    Args:
+        df (pd.DataFrame): DataFrame a otimizar (alterado no próprio objeto)
+        
+    Returns:
+        pd.DataFrame: O mesmo DataFrame, com os tipos otimizados
+    """
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include='float').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    
+    if len(df) > 0:
+        for col in df.select_dtypes(include=['object', 'string']).columns:
+            if df[col].nunique(dropna=False) / len(df) < 0.5:
+                df[col] = df[col].astype('category')
+    return df
+
+@st.cache_data(ttl=3600)  # Cache por 1 hora
+def convert_to_parquet(file_id, modified_time, file_name, _file_content, dtype=None):
+    """
+    Converte as abas de um arquivo Excel para Parquet, uma única vez por versão do arquivo
+    
+    O cache usa o ID e a data de modificação do arquivo no Drive, então uma nova versão
+    do arquivo gera uma nova conversão automaticamente.
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        file_name (str): Nome do arquivo
+        _file_content (BytesIO): Conteúdo do arquivo (não entra na chave do cache)
+        dtype (dict, optional): Tipos das colunas, ex.: obtidos com probe_excel_columns
+        
+    Returns:
+        dict: Dicionário {aba: caminho do arquivo Parquet}, ou None em caso de erro
+    """
+    df_data = read_file_to_dataframe(_file_content, file_name, dtype=dtype)
+    if df_data is None:
+        return None
+    if not isinstance(df_data, dict):
+        df_data = {None: df_data}
+    
+    PARQUET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Os tipos usados na leitura fazem parte do nome: leituras com tipos diferentes não se sobrescrevem
+    dtype_items = sorted((str(col), str(col_dtype)) for col, col_dtype in (dtype or {}).items())
+    digest = hashlib.md5(f"{modified_time}_{dtype_items}".encode()).hexdigest()
+    
+    parquet_paths = {}
+    for i, (sheet_name, df) in enumerate(df_data.items()):
+        df = df.copy()
+        # Parquet exige nomes de coluna em texto e um único tipo por coluna
+        df.columns = [str(col) for col in df.columns]
+        for col in df.select_dtypes(include='object').columns:
+            if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+                df[col] = df[col].astype('string')
+        optimize_dtypes(df)
+        
+        path = PARQUET_CACHE_DIR / f"{file_id}_{digest}_{i}.parquet"
+        # Escreve em um arquivo temporário para que outra sessão nunca leia um arquivo incompleto
+        with tempfile.NamedTemporaryFile(dir=PARQUET_CACHE_DIR, suffix=".tmp", delete=False) as tmp_file:
+            tmp_path = Path(tmp_file.name)
+        try:
+            df.to_parquet(tmp_path, compression="zstd", index=False)
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        parquet_paths[sheet_name] = str(path)
+    
+    # Remove as conversões das versões anteriores do mesmo arquivo
+    for old_path in PARQUET_CACHE_DIR.glob(f"{file_id}_*.parquet"):
+        old_id, old_digest, _ = old_path.stem.rsplit("_", 2)
+        if old_id == file_id and old_digest != digest:
+            old_path.unlink(missing_ok=True)
+    
+    return parquet_paths
+
+def read_parquet_data(parquet_paths, columns=None):
+    """
+    Lê os dados convertidos por convert_to_parquet
+    
+    Args:
+        parquet_paths (dict): Dicionário {aba: caminho do arquivo Parquet}
+        columns (list, optional): Colunas a carregar (None carrega todas)
+        
+    Returns:
+        pd.DataFrame ou dict: DataFrame único ou dicionário com um DataFrame por aba
+    """
+    import pyarrow.parquet as pq
+    
+    dataframes = {}
+    for sheet_name, path in parquet_paths.items():
+        sheet_columns = None
+        if columns is not None:
+            # Apenas as colunas que existem nesta aba
+            available = set(pq.read_schema(path).names)
+            sheet_columns = [str(col) for col in columns if str(col) in available]
+        dataframes[sheet_name] = pd.read_parquet(path, columns=sheet_columns)
+    
+    if len(dataframes) > 1:
+        return dataframes
+    else:
+        return next(iter(dataframes.values()))
+
+@st.cache_data(ttl=3600)  # Cache por 1 hora
+def excel_sheet_dimensions(file_id, modified_time, _file_content):
+    """
+    Obtém as dimensões de cada aba sem carregar os dados
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        _file_content (BytesIO): Conteúdo do arquivo (não entra na chave do cache)
+        
+    Returns:
+        dict: Dicionário {aba: (linhas, colunas)}; None quando a dimensão não está gravada no arquivo
+    """
+    workbook = load_workbook(_file_content, read_only=True, data_only=True)
+    try:
+        return {
+            ws.title: (ws.max_row, ws.max_column)
+            for ws in workbook.worksheets
+        }
+    finally:
+        workbook.close()
+
+def is_large_sheet(n_rows, n_cols):
+    """
+    Indica se a aba é grande demais para ser carregada inteira na memória
+    
+    Abas sem dimensão conhecida são tratadas como grandes, por segurança.
+    """
+    if n_rows is None or n_cols is None:
+        return True
+    return n_rows * n_cols * 8 > MAX_IN_MEMORY_BYTES
+
+def _normalize_header(header):
+    """
+    Ajusta os nomes das colunas como o pd.read_excel: "Unnamed: i" para células vazias
+    e sufixos ".1", ".2"... para nomes repetidos
+    """
+    unnamed = [i for i, col in enumerate(header) if col is None or col == ""]
+    columns = [f"Unnamed: {i}" if i in unnamed else col for i, col in enumerate(header)]
+    counts = {}
+    # Assim como o pandas, as colunas nomeadas são renomeadas antes das vazias
+    for i in [i for i in range(len(columns)) if i not in unnamed] + unnamed:
+        col = base = columns[i]
+        count = counts.get(base, 0)
+        while count > 0:
+            counts[base] = count + 1
+            col = f"{base}.{count}"
+            count = count + 1 if col in columns else counts.get(col, 0)
+        columns[i] = col
+        counts[col] = count + 1
+    return columns
+
+def _numeric_columns(chunk_df):
+    """
+    Colunas em que a maior parte dos valores preenchidos é numérica (células de texto isoladas
+    não tiram a coluna das estatísticas)
+    """
+    numeric_cols = []
+    for col in chunk_df.columns:
+        values = chunk_df[col].dropna()
+        is_number = values.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, bool))
+        if len(values) > 0 and is_number.mean() >= 0.5:
+            numeric_cols.append(col)
+    return numeric_cols
+
+def iter_excel_chunks(file_content, sheet, chunk=50_000):
+    """
+    Lê uma aba do Excel em blocos de linhas, sem carregar a planilha inteira
+    
+    Args:
+        file_content (BytesIO): Conteúdo do arquivo
+        sheet (str): Nome da aba
+        chunk (int): Número de linhas por bloco
+        
+    Yields:
+        pd.DataFrame: Bloco de linhas da aba
+    """
+    workbook = load_workbook(file_content, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = _normalize_header(header)
+        
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+@st.cache_data(ttl=3600)  # Cache por 1 hora
+def summarize_large_sheet(file_id, modified_time, file_name, sheet, _file_content, sample_size=50_000):
+    """
+    Calcula estatísticas das colunas numéricas e uma amostra de uma aba grande, lendo em blocos
+    
+    Média e desvio padrão são combinados bloco a bloco (algoritmo de Welford), então
+    o uso de memória não depende do tamanho da planilha.
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        file_name (str): Nome do arquivo
+        sheet (str): Nome da aba
+        _file_content (BytesIO): Conteúdo do arquivo (não entra na chave do cache)
+        sample_size (int): Número máximo de linhas da amostra usada nos gráficos
+        
+    Returns:
+        dict: Total de linhas ("rows"), estatísticas por coluna ("numeric") e amostra ("sample")
+    """
+    rng = np.random.default_rng(0)
+    total_rows = 0
+    count, mean, m2 = {}, {}, {}
+    numeric_cols = None
+    sample = None
+    
+    with st.spinner(f"Processando {file_name} ({sheet}) em blocos..."):
+        for chunk_df in iter_excel_chunks(_file_content, sheet):
+            total_rows += len(chunk_df)
+            
+            # As colunas numéricas são definidas no primeiro bloco; nos demais os valores
+            # que não são números viram NaN, então nenhum bloco fica fora das estatísticas
+            if numeric_cols is None:
+                numeric_cols = _numeric_columns(chunk_df)
+            for col in numeric_cols:
+                chunk_df[col] = pd.to_numeric(chunk_df[col], errors='coerce')
+            
+            # Amostra uniforme sem conhecer o total de linhas: cada linha recebe uma chave
+            # aleatória e ficam as sample_size linhas com as menores chaves
+            keyed = chunk_df.assign(_sample_key=rng.random(len(chunk_df)))
+            if sample is not None:
+                keyed = pd.concat([sample, keyed], ignore_index=True)
+            sample = keyed.nsmallest(sample_size, '_sample_key')
+            
+            for col in numeric_cols:
+                values = chunk_df[col].dropna()
+                n_b = len(values)
+                if n_b == 0:
+                    continue
+                mean_b = values.mean()
+                m2_b = ((values - mean_b) ** 2).sum()
+                
+                # Combina as estatísticas do bloco com as acumuladas
+                n_a = count.get(col, 0)
+                mean_a = mean.get(col, 0.0)
+                delta = mean_b - mean_a
+                n = n_a + n_b
+                count[col] = n
+                mean[col] = mean_a + delta * n_b / n
+                m2[col] = m2.get(col, 0.0) + m2_b + delta ** 2 * n_a * n_b / n
+    
+    stats = pd.DataFrame({
+        'mean': pd.Series(mean, dtype='float64'),
+        'std': pd.Series({col: np.sqrt(m2[col] / (count[col] - 1)) if count[col] > 1 else np.nan for col in count}, dtype='float64'),
+    })
+    if sample is not None:
+        sample = optimize_dtypes(sample.drop(columns='_sample_key').sort_index().reset_index(drop=True))
+    else:
+        sample = pd.DataFrame()
+    return {"rows": total_rows, "numeric": stats, "sample": sample}
+
+def render_large_workbook(file_id, modified_time, file_content, file_name, dimensions):
+    """
+    Mostra as abas de uma planilha grande a partir de estatísticas calculadas em blocos e de uma amostra
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        file_content (BytesIO): Conteúdo do arquivo
+        file_name (str): Nome do arquivo
+        dimensions (dict): Dimensões de cada aba, como retornado por excel_sheet_dimensions
+    """
+    st.info("Planilha muito grande para ser carregada inteira: os gráficos usam uma amostra dos dados.")
+    
+    sheet_tabs = st.tabs(list(dimensions.keys()))
+    for i, sheet_name in enumerate(dimensions.keys()):
+        with sheet_tabs[i]:
+            summary = summarize_large_sheet(file_id, modified_time, file_name, sheet_name, file_content)
+            st.dataframe(summary["sample"].head(1000), height=300)
+            generate_auto_graphs(
+                summary["sample"], f"{file_id}_{sheet_name}_amostra", modified_time,
+                tab_name=f"({sheet_name})", stats=summary
+            )
+
+def fetch_and_parse(file_id, file_name, modified_time, md5_checksum, file_size):
+    """
+    Baixa um arquivo do Google Drive e carrega seus dados
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        file_name (str): Nome do arquivo
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        md5_checksum (str): Checksum MD5 do arquivo no Google Drive
+        file_size (int): Tamanho do arquivo em bytes
+        
+    Returns:
+        tuple: (dados, planilha grande). Os dados são um DataFrame ou dicionário de DataFrames;
+            para planilhas grandes, os dados são None e o segundo item traz (conteúdo, dimensões)
+    """
+    file_content = download_file(file_id, file_name, modified_time, md5_checksum, file_size)
+    if not file_content:
+        return None, None
+    
+    dimensions = excel_sheet_dimensions(file_id, modified_time, file_content)
+    if any(is_large_sheet(*dims) for dims in dimensions.values()):
+        # Guarda apenas o conteúdo: os dados serão lidos em blocos
+        return None, (file_content, dimensions)
+    
+    # Mesmos tipos da visualização: cada versão do arquivo é convertida uma única vez
+    _, column_dtypes = probe_excel_columns(file_id, modified_time, file_name, file_content)
+    parquet_paths = convert_to_parquet(file_id, modified_time, file_name, file_content, dtype=column_dtypes)
+    df_data = read_parquet_data(parquet_paths) if parquet_paths else None
+    return df_data, None
+
+def session_cache_keys(file_id, modified_time):
+    """
+    Chaves da sessão com os dados de uma versão do arquivo (uma nova versão no Drive gera novas chaves)
+    
+    Returns:
+        tuple: Chave dos dados carregados e chave das planilhas grandes (lidas em blocos)
+    """
+    return f"file_data_{file_id}_{modified_time}", f"large_file_{file_id}_{modified_time}"
+
+def store_session_data(file_id, modified_time, df_data, large_file):
+    """
+    Guarda na sessão os dados de uma versão do arquivo e remove os de versões anteriores
+    
+    Args:
+        file_id (str): ID do arquivo no Google Drive
+        modified_time (str): Data de modificação do arquivo no Google Drive
+        df_data (pd.DataFrame ou dict): Dados carregados, como retornado por fetch_and_parse
+        large_file (tuple): (conteúdo, dimensões) para planilhas grandes, ou None
+    """
+    file_cache_key, large_cache_key = session_cache_keys(file_id, modified_time)
+    
+    # A data de modificação não contém "_", então o restante da chave identifica só a versão
+    for prefix in (f"file_data_{file_id}_", f"large_file_{file_id}_"):
+        for key in list(st.session_state.keys()):
+            version = key[len(prefix):] if isinstance(key, str) and key.startswith(prefix) else None
+            if version is not None and "_" not in version and version != modified_time:
+                del st.session_state[key]
+    
+    if large_file is not None:
+        st.session_state[large_cache_key] = large_file
+    else:
+        st.session_state[file_cache_key] = df_data
+
+def fetch_files_in_parallel(files_df):
+    """
+    Baixa e carrega em paralelo os arquivos que ainda não estão na sessão
+    
+    Args:
+        files_df (pd.DataFrame): Arquivos listados do Google Drive
+    """
+    pending = [
+        file_info for file_info in files_df.itertuples(index=False)
+        if not any(
+            key in st.session_state
+            for key in session_cache_keys(file_info.id, file_info.modifiedTimeRaw)
+        )
+    ]
+    if not pending:
+        return
+    
+    # As threads precisam do contexto do script para usar cache e elementos do Streamlit
+    ctx = get_script_run_ctx()
+    
+    with st.spinner("Carregando dados..."):
+        with ThreadPoolExecutor(
+            max_workers=MAX_DOWNLOAD_WORKERS,
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    fetch_and_parse,
+                    file_info.id, file_info.name,
+                    file_info.modifiedTimeRaw, getattr(file_info, 'md5Checksum', None), file_info.sizeBytes
+                ): (file_info.id, file_info.modifiedTimeRaw)
+                for file_info in pending
+            }
+            
+            # A sessão é atualizada apenas na thread principal
+            for future in as_completed(futures):
+                file_id, modified_time = futures[future]
+                try:
+                    df_data, large_file = future.result()
+                except Exception as e:
+                    st.error(f"Erro ao carregar arquivo: {e}")
+                    df_data, large_file = None, None
+                
+                store_session_data(file_id, modified_time, df_data, large_file)
+
+def _plot_frame(df, n=PLOT_MAX_ROWS):
+    """
+    Amostra do DataFrame usada nos gráficos, para não enviar milhões de linhas ao navegador
+    """
+    return df if len(df) <= n else df.sample(n, random_state=0)
+
+def dataframe_key(df):
+    """
+    Gera uma chave que identifica o conteúdo de um DataFrame, usada nos caches das análises
+    
+    O DataFrame é percorrido uma única vez aqui, em vez de ser hasheado em cada função em cache.
+    """
+    return (df.shape, tuple(map(str, df.columns)), int(pd.util.hash_pandas_object(df).sum()))
+
+def dataframe_info(df, data_key, version):
+    """
+    Chave do conteúdo e colunas agrupadas por tipo do DataFrame
+    
+    O resultado fica guardado na sessão (uma entrada por origem dos dados, sobrescrita a cada
+    nova versão), então as reexecuções dos gráficos não percorrem os dados e os tipos das
+    colunas novamente.
+    
+    Args:
+        df (pd.DataFrame): DataFrame a analisar
+        data_key (str): Origem dos dados, ex.: ID do arquivo e nome da aba
+        version (str): Versão dos dados, ex.: data de modificação do arquivo no Google Drive
+        
+    Returns:
+        tuple: Chave do conteúdo (dataframe_key) e dicionário com as colunas
+            numéricas ('num'), categóricas ('cat') e de datas ('dt')
+    """
+    info_key = f"df_info_{data_key}"
+    # Colunas escolhidas pelo usuário também mudam o DataFrame, então fazem parte da versão
+    token = (version, df.shape, tuple(map(str, df.columns)))
+    cached = st.session_state.get(info_key)
+    if cached is not None and cached[0] == token:
+        return cached[1], cached[2]
+    
+    col_kinds = {
+        'num': df.select_dtypes(include=np.number).columns.tolist(),
+        'cat': df.select_dtypes(include=['object', 'string', 'category']).columns.tolist(),
+        'dt': df.select_dtypes(include=['datetime64']).columns.tolist(),
+    }
+    df_key = dataframe_key(df)
+    st.session_state[info_key] = (token, df_key, col_kinds)
+    return df_key, col_kinds
+
+@st.cache_data(ttl=600)  # Cache por 10 minutos
+def compute_describe(df_key, _df):
+    """
+    Resumo estatístico (describe) do DataFrame identificado por df_key
+    """
+    return _df.describe()
+
+@st.cache_data(ttl=600)  # Cache por 10 minutos
+def compute_correlation(df_key, columns, _df):
+    """
+    Matriz de correlação das colunas informadas do DataFrame identificado por df_key
+    """
+    return _df[list(columns)].corr()
+
+@st.cache_data(ttl=600)  # Cache por 10 minutos
+def compute_value_counts(df_key, column, _df):
+    """
+    Contagem de valores de uma coluna do DataFrame identificado por df_key
+    """
+    return _df[column].value_counts()
+
+def generate_metrics(df, col_kinds, stats=None):
     """
     Gera métricas descritivas para um DataFrame
     
     Args:
         df (pd.DataFrame): DataFrame para gerar métricas
+        col_kinds (dict): Colunas agrupadas por tipo, como retornado por dataframe_info
+        stats (dict, optional): Estatísticas calculadas em blocos (summarize_large_sheet),
+            quando df é apenas uma amostra dos dados
     """
     # Mostrar dimensões e informações básicas
-    st.write(f"**Dimensões:** {df.shape[0]} linhas x {df.shape[1]} colunas")
+    n_rows = stats["rows"] if stats else df.shape[0]
+    st.write(f"**Dimensões:** {n_rows} linhas x {df.shape[1]} colunas")
     
-    # Encontrar colunas numéricas para métricas
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    # Colunas numéricas para métricas
+    numeric_cols = col_kinds['num']
     
     if len(numeric_cols) > 0:
-        # Criar métricas para até 4 colunas numéricas
+        # Criar métricas para até 4 colunas numéricas (média e mediana calculadas de uma só vez)
+        metric_stats = df[numeric_cols[:4]].agg(['mean', 'median']).T
         cols = st.columns(min(4, len(numeric_cols)))
-        for i, col_name in enumerate(numeric_cols[:4]):
+        for i, row in enumerate(metric_stats.itertuples()):
+            col_name = row.Index
             with cols[i % 4]:
-                median = df[col_name].median()
-                mean = df[col_name].mean()
+                # Com estatísticas em blocos a média é exata e a mediana vem da amostra
+                median = row.median
+                if stats and col_name in stats["numeric"].index:
+                    mean = stats["numeric"].loc[col_name, 'mean']
+                else:
+                    mean = row.mean
                 st.metric(
                     label=f"{col_name}",
                     value=f"{mean:.2f}",
                     delta=f"{mean - median:.2f} da mediana"
                 )
 
-def generate_auto_graphs(df, tab_name=""):
+@st.fragment
+def generate_auto_graphs(df, data_key, version, tab_name="", stats=None):
     """
     Gera gráficos automáticos baseados nos dados do DataFrame
     
+    Como fragmento, trocar colunas ou tipos de gráfico executa novamente apenas esta função,
+    reaproveitando o DataFrame recebido na primeira execução.
+    
     Args:
         df (pd.DataFrame): DataFrame para gerar visualizações
+        data_key (str): Origem dos dados (ex.: ID do arquivo e nome da aba), usada nos caches da sessão
+        version (str): Versão dos dados, ex.: data de modificação do arquivo no Google Drive
         tab_name (str): Nome da aba/planilha para contexto
+        stats (dict, optional): Estatísticas calculadas em blocos, quando df é uma amostra
     """
     if df is None or df.empty:
         st.warning("Não há dados para visualizar.")
         return
     
+    # O plotly só é importado quando algum gráfico é realmente exibido
+    import plotly.express as px
+    
     st.subheader(f"📊 Visualização de Dados {tab_name}")
     
+    # Chave do conteúdo e tipos das colunas, reaproveitados entre interações
+    df_key, col_kinds = dataframe_info(df, data_key, version)
+    
     # Gerar métricas básicas
-    generate_metrics(df)
+    generate_metrics(df, col_kinds, stats)
+    
+    # Dados enviados aos gráficos (amostra, se o DataFrame for muito grande)
+    plot_df = _plot_frame(df)
+    if len(plot_df) < len(df):
+        st.caption(f"Os gráficos usam uma amostra de {len(plot_df)} linhas.")
     
     # Mostrar resumo estatístico
     with st.expander("📝 Resumo estatístico"):
-        st.dataframe(df.describe())
+        st.dataframe(compute_describe(df_key, df))
     
     # Análises por tipo de dados
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    numeric_cols = col_kinds['num']
+    categorical_cols = col_kinds['cat']
+    date_cols = col_kinds['dt']
     
     # Criar tabs para diferentes tipos de visualizações
     if numeric_cols or categorical_cols or date_cols:
@@ -159,28 +802,30 @@ def generate_auto_graphs(df, tab_name=""):
                     key=f"dist_{tab_name}"
                 )
                 fig = px.histogram(
-                    df, x=col_hist,
+                    plot_df, x=col_hist,
                     title=f"Distribuição de {col_hist}",
                     marginal="box"
                 )
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Mostrar estatísticas específicas da coluna
-                q1 = df[col_hist].quantile(0.25)
-                q3 = df[col_hist].quantile(0.75)
-                iqr = q3 - q1
+                col_stats = df[col_hist].agg(['mean', 'median', 'std']).astype(float)
+                if stats and col_hist in stats["numeric"].index:
+                    # Média e desvio padrão exatos (calculados em blocos); a mediana vem da amostra
+                    col_stats['mean'] = stats["numeric"].loc[col_hist, 'mean']
+                    col_stats['std'] = stats["numeric"].loc[col_hist, 'std']
                 
                 col1, col2, col3 = st.columns(3)
-                col1.metric("Média", f"{df[col_hist].mean():.2f}")
-                col2.metric("Mediana", f"{df[col_hist].median():.2f}")
-                col3.metric("Desvio Padrão", f"{df[col_hist].std():.2f}")
+                col1.metric("Média", f"{col_stats['mean']:.2f}")
+                col2.metric("Mediana", f"{col_stats['median']:.2f}")
+                col3.metric("Desvio Padrão", f"{col_stats['std']:.2f}")
         
         # Tab para correlações
         with graph_tabs[1]:
             if len(numeric_cols) >= 2:
                 # Matriz de correlação
                 st.subheader("Matriz de Correlação")
-                corr = df[numeric_cols].corr()
+                corr = compute_correlation(df_key, tuple(numeric_cols), df)
                 fig = px.imshow(
                     corr, 
                     text_auto=True,
@@ -202,22 +847,29 @@ def generate_auto_graphs(df, tab_name=""):
                     key=f"y_{tab_name}"
                 )
                 
+                # Muitos pontos: mapa de densidade, já que pontos individuais ficariam ilegíveis
+                if len(df) > SCATTER_MAX_POINTS:
+                    fig = px.density_heatmap(
+                        plot_df, x=col_x, y=col_y,
+                        nbinsx=100, nbinsy=100,
+                        title=f"{col_x} vs {col_y}"
+                    )
                 # Adicionar cor opcional se temos categorias
-                if categorical_cols:
+                elif categorical_cols:
                     color_col = st.selectbox(
                         "Colorir por categoria (opcional):", 
                         [None] + categorical_cols,
                         key=f"color_{tab_name}"
                     )
                     fig = px.scatter(
-                        df, x=col_x, y=col_y, 
+                        plot_df, x=col_x, y=col_y, 
                         color=color_col, 
                         trendline="ols",
                         title=f"{col_x} vs {col_y}"
                     )
                 else:
                     fig = px.scatter(
-                        df, x=col_x, y=col_y,
+                        plot_df, x=col_x, y=col_y,
                         trendline="ols", 
                         title=f"{col_x} vs {col_y}"
                     )
@@ -234,7 +886,7 @@ def generate_auto_graphs(df, tab_name=""):
                 )
                 
                 # Contar valores únicos
-                value_counts = df[col_cat].value_counts().reset_index()
+                value_counts = compute_value_counts(df_key, col_cat, df).reset_index()
                 value_counts.columns = [col_cat, 'Contagem']
                 
                 # Limitar a 15 categorias mais frequentes
@@ -269,12 +921,12 @@ def generate_auto_graphs(df, tab_name=""):
                     
                     if plot_type == "Boxplot":
                         fig = px.box(
-                            df, x=col_cat, y=num_col,
+                            plot_df, x=col_cat, y=num_col,
                             title=f"{num_col} por {col_cat}"
                         )
                     else:
                         fig = px.violin(
-                            df, x=col_cat, y=num_col,
+                            plot_df, x=col_cat, y=num_col,
                             title=f"{num_col} por {col_cat}",
                             box=True
                         )
@@ -283,6 +935,82 @@ def generate_auto_graphs(df, tab_name=""):
     else:
         st.info("Não foram encontradas colunas apropriadas para gerar gráficos automaticamente.")
 
+@st.fragment
+def render_file(file_info):
+    """
+    Carrega (apenas quando necessário) e mostra os dados de um arquivo do Drive
+    
+    Como fragmento, as interações com os gráficos executam novamente apenas esta parte da página.
+    
+    Args:
+        file_info (pd.Series): Informações do arquivo listado do Google Drive
+    """
+    st.subheader(f"📄 {file_info['name']}")
+    
+    # Dados em cache na sessão (usando o ID e a data de modificação do arquivo como chave)
+    file_cache_key, large_cache_key = session_cache_keys(file_info['id'], file_info['modifiedTimeRaw'])
+    
+    if file_cache_key not in st.session_state and large_cache_key not in st.session_state:
+        with st.spinner("Carregando dados..."):
+            df_data, large_file = fetch_and_parse(
+                file_info['id'], file_info['name'],
+                file_info['modifiedTimeRaw'], file_info.get('md5Checksum'), file_info['sizeBytes']
+            )
+        store_session_data(file_info['id'], file_info['modifiedTimeRaw'], df_data, large_file)
+    
+    df_data = st.session_state.get(file_cache_key)
+    
+    if large_cache_key in st.session_state:
+        file_content, dimensions = st.session_state[large_cache_key]
+        render_large_workbook(
+            file_info['id'], file_info['modifiedTimeRaw'], file_content, file_info['name'], dimensions
+        )
+    elif df_data is not None:
+        if isinstance(df_data, dict):
+            sheet_tabs = st.tabs(list(df_data.keys()))
+            
+            for j, sheet_name in enumerate(df_data.keys()):
+                with sheet_tabs[j]:
+                    df = df_data[sheet_name]
+                    st.dataframe(df, height=300)
+                    generate_auto_graphs(
+                        df, f"{file_info['id']}_{sheet_name}", file_info['modifiedTimeRaw'],
+                        tab_name=f"({sheet_name})"
+                    )
+        else:
+            st.dataframe(df_data, height=300)
+            generate_auto_graphs(df_data, file_info['id'], file_info['modifiedTimeRaw'])
+    else:
+        st.warning("Não foi possível ler este arquivo Excel.")
+
+def show_file_data(file_info):
+    """
+    Callback do botão "Visualizar Dados": guarda o arquivo na sessão e abre a visualização
+    
+    Por ser executado antes da próxima execução do script, a troca de visão não precisa de um rerun extra.
+    
+    Args:
+        file_info (pd.Series): Informações do arquivo listado do Google Drive
+    """
+    file_content = download_file(
+        file_info['id'], file_info['name'],
+        file_info['modifiedTimeRaw'], file_info.get('md5Checksum'), file_info['sizeBytes']
+    )
+    if file_content:
+        st.session_state.selected_file = {
+            'name': file_info['name'],
+            'content': file_content,
+            'id': file_info['id'],
+            'modifiedTime': file_info['modifiedTimeRaw']
+        }
+        st.session_state.active_view = DATA_VIEW
+
+def clear_selected_file():
+    """
+    Callback para voltar à visualização de todos os arquivos
+    """
+    st.session_state.pop('selected_file', None)
+
 # Barra lateral com opções
 with st.sidebar:
     st.header("Opções")
@@ -305,10 +1033,14 @@ try:
         if 'createdTime' in files_df.columns:
             files_df['createdTime'] = pd.to_datetime(files_df['createdTime']).dt.strftime('%d/%m/%Y %H:%M')
         if 'modifiedTime' in files_df.columns:
+            # Mantém o valor original (com segundos) para identificar a versão do arquivo nos caches
+            files_df['modifiedTimeRaw'] = files_df['modifiedTime']
             files_df['modifiedTime'] = pd.to_datetime(files_df['modifiedTime']).dt.strftime('%d/%m/%Y %H:%M')
         
         # Adicionar formatação para o tamanho
         if 'size' in files_df.columns:
+            # Mantém o tamanho em bytes para decidir como baixar o arquivo
+            files_df['sizeBytes'] = pd.to_numeric(files_df['size'])
             files_df['size'] = files_df['size'].astype(float) / 1024
             files_df['size'] = files_df['size'].round(2).astype(str) + ' KB'
         
@@ -316,10 +1048,16 @@ try:
         if 'webViewLink' not in files_df.columns:
             files_df['webViewLink'] = None
         
-        # Criar tabs para navegação
-        tab1, tab2 = st.tabs(["📁 Arquivos Excel", "📊 Visualização de Dados"])
+        # Navegação entre as visões (apenas a visão ativa é executada)
+        active_view = st.radio(
+            "Navegação",
+            [FILES_VIEW, DATA_VIEW],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="active_view"
+        )
         
-        with tab1:
+        if active_view == FILES_VIEW:
             # Exibir arquivos em uma tabela interativa
             st.subheader(f"Arquivos Excel ({len(files_df)})")
             
@@ -351,92 +1089,107 @@ try:
                 with col2:
                     download_btn = st.download_button(
                         label="📥 Baixar Arquivo",
-                        data=download_file(file_id, selected_file),
+                        data=download_file(
+                            file_id, selected_file,
+                            file_info['modifiedTimeRaw'], file_info.get('md5Checksum'), file_info['sizeBytes']
+                        ),
                         file_name=selected_file,
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     )
                 
-                if st.button("📊 Visualizar Dados"):
-                    # Armazenar o arquivo selecionado na sessão
-                    file_content = download_file(file_id, selected_file)
-                    if file_content:
-                        st.session_state.selected_file = {
-                            'name': selected_file,
-                            'content': file_content,
-                            'id': file_id
-                        }
-                        # Mudar para a segunda tab automaticamente
-                        st.query_params(tab='visualizacao')
-                        st.experimental_rerun()
+                # Armazenar o arquivo selecionado na sessão e mudar para a visualização
+                st.button("📊 Visualizar Dados", on_click=show_file_data, args=(file_info,))
         
-        with tab2:
-            if st.query_params.get('tab') == ['visualizacao'] and hasattr(st.session_state, 'selected_file'):
+        else:
+            if 'selected_file' in st.session_state:
                 selected_file = st.session_state.selected_file
                 st.subheader(f"📄 {selected_file['name']}")
+                st.button("📁 Ver todos os arquivos", on_click=clear_selected_file)
+                
+                # Planilhas muito grandes são lidas em blocos, sem carregar tudo na memória
+                dimensions = excel_sheet_dimensions(
+                    selected_file['id'], selected_file['modifiedTime'], selected_file['content']
+                )
+                if any(is_large_sheet(*dims) for dims in dimensions.values()):
+                    render_large_workbook(
+                        selected_file['id'], selected_file['modifiedTime'],
+                        selected_file['content'], selected_file['name'], dimensions
+                    )
+                else:
+                    # Amostra do arquivo para escolher as colunas e inferir os tipos
+                    all_columns, column_dtypes = probe_excel_columns(
+                        selected_file['id'],
+                        selected_file['modifiedTime'],
+                        selected_file['name'],
+                        selected_file['content']
+                    )
+                    chosen_columns = st.multiselect(
+                        "Colunas",
+                        all_columns,
+                        default=all_columns,
+                        key=f"columns_{selected_file['id']}"
+                    )
                 
-                # Tentar ler o arquivo
-                df_data = read_file_to_dataframe(selected_file['content'], selected_file['name'])
+                    # Converter para Parquet (uma vez por versão) e ler apenas as colunas escolhidas
+                    parquet_paths = convert_to_parquet(
+                        selected_file['id'],
+                        selected_file['modifiedTime'],
+                        selected_file['name'],
+                        selected_file['content'],
+                        dtype=column_dtypes
+                    )
+                    df_data = None
+                    if parquet_paths:
+                        df_data = read_parquet_data(
+                            parquet_paths,
+                            columns=chosen_columns if len(chosen_columns) < len(all_columns) else None
+                        )
                 
-                if df_data is not None:
-                    # Verificar se o resultado é um dicionário (múltiplas abas) ou um DataFrame único
-                    if isinstance(df_data, dict):
-                        # Criar tabs dinâmicas para cada aba da planilha
-                        sheet_tabs = st.tabs(list(df_data.keys()))
+                    if df_data is not None:
+                        # Verificar se o resultado é um dicionário (múltiplas abas) ou um DataFrame único
+                        if isinstance(df_data, dict):
+                            # Criar tabs dinâmicas para cada aba da planilha
+                            sheet_tabs = st.tabs(list(df_data.keys()))
                         
-                        for i, sheet_name in enumerate(df_data.keys()):
-                            with sheet_tabs[i]:
-                                st.subheader(f"Aba: {sheet_name}")
-                                df = df_data[sheet_name]
-                                st.dataframe(df, height=300)
-                                generate_auto_graphs(df, tab_name=f"({sheet_name})")
+                            for i, sheet_name in enumerate(df_data.keys()):
+                                with sheet_tabs[i]:
+                                    st.subheader(f"Aba: {sheet_name}")
+                                    df = df_data[sheet_name]
+                                    st.dataframe(df, height=300)
+                                    generate_auto_graphs(
+                                        df, f"{selected_file['id']}_{sheet_name}_selecionado",
+                                        selected_file['modifiedTime'], tab_name=f"({sheet_name})"
+                                    )
+                        else:
+                            # Mostrar um único DataFrame
+                            st.dataframe(df_data, height=300)
+                            generate_auto_graphs(
+                                df_data, f"{selected_file['id']}_selecionado", selected_file['modifiedTime']
+                            )
                     else:
-                        # Mostrar um único DataFrame
-                        st.dataframe(df_data, height=300)
-                        generate_auto_graphs(df_data)
-                else:
-                    st.warning("Não foi possível ler o arquivo Excel.")
+                        st.warning("Não foi possível ler o arquivo Excel.")
             else:
-                # Carregar todos os arquivos Excel automaticamente
-                st.info("Selecione um arquivo Excel na aba 'Arquivos Excel' para visualizar seus dados, ou aguarde enquanto carregamos todos os arquivos disponíveis.")
+                # Carregar os arquivos Excel sob demanda
+                st.info("Selecione um arquivo Excel em 'Arquivos Excel' para visualizar seus dados, ou escolha um dos arquivos disponíveis abaixo.")
                 
-                # Mostrar visualização de todos os arquivos Excel encontrados
+                # Mostrar visualização dos arquivos Excel encontrados
                 if len(files_df) > 0:
-                    # Criar tabs dinâmicas para cada arquivo Excel
-                    excel_file_tabs = st.tabs([name for name in files_df['name']])
+                    file_names = dict(zip(files_df['id'], files_df['name']))
+                    
+                    # Apenas o arquivo escolhido é baixado e lido
+                    active_file_id = st.radio(
+                        "Arquivo:",
+                        list(file_names.keys()),
+                        format_func=file_names.get,
+                        horizontal=True,
+                        key="active_tab"
+                    )
+                    
+                    # Baixar e ler em paralelo os arquivos que ainda não estão em cache
+                    if st.button("⬇️ Carregar todos os arquivos"):
+                        fetch_files_in_parallel(files_df)
                     
-                    for i, (idx, file_info) in enumerate(files_df.iterrows()):
-                        with excel_file_tabs[i]:
-                            st.subheader(f"📄 {file_info['name']}")
-                            
-                            # Verificar se já temos os dados em cache (usando o ID do arquivo como chave)
-                            file_cache_key = f"file_data_{file_info['id']}"
-                            
-                            if file_cache_key not in st.session_state:
-                                with st.spinner("Carregando dados..."):
-                                    file_content = download_file(file_info['id'], file_info['name'])
-                                    if file_content:
-                                        df_data = read_file_to_dataframe(file_content, file_info['name'])
-                                        st.session_state[file_cache_key] = df_data
-                                    else:
-                                        st.session_state[file_cache_key] = None
-                            
-                            df_data = st.session_state[file_cache_key]
-                            
-                            if df_data is not None:
-                                # Similar ao código anterior, mas para cada arquivo
-                                if isinstance(df_data, dict):
-                                    sheet_tabs = st.tabs(list(df_data.keys()))
-                                    
-                                    for j, sheet_name in enumerate(df_data.keys()):
-                                        with sheet_tabs[j]:
-                                            df = df_data[sheet_name]
-                                            st.dataframe(df, height=300)
-                                            generate_auto_graphs(df, tab_name=f"({sheet_name})")
-                                else:
-                                    st.dataframe(df_data, height=300)
-                                    generate_auto_graphs(df_data)
-                            else:
-                                st.warning("Não foi possível ler este arquivo Excel.")
+                    render_file(files_df[files_df['id'] == active_file_id].iloc[0])
 
 except Exception as e:
     st.error(f"Ocorreu um erro: {e}")
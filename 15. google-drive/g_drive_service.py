@@ -1,4 +1,6 @@
 import streamlit as st
+import httplib2
+import google_auth_httplib2
 from googleapiclient.discovery import build
 from oauth2client.service_account import ServiceAccountCredentials
 from google.oauth2 import service_account
@@ -7,16 +9,36 @@ class GoogleDriveService:
     def __init__(self):
         self._SCOPES = ['https://www.googleapis.com/auth/drive']
 
-    def build(self):
+    def credentials(self):
         # Usar credenciais diretamente dos secrets do Streamlit
         creds_dict = st.secrets["connections"]["gdrive"]
         
         # Criar credenciais a partir do dicionário
-        creds = service_account.Credentials.from_service_account_info(
+        return service_account.Credentials.from_service_account_info(
             creds_dict, scopes=self._SCOPES
         )
+
+    def build(self):
+        creds = self.credentials()
         
-        # Construir o serviço
-        service = build('drive', 'v3', credentials=creds)
+        # Construir o serviço com o documento de descoberta incluído na biblioteca (sem requisição HTTP)
+        service = build(
+            'drive', 'v3', credentials=creds,
+            cache_discovery=False, static_discovery=True
+        )
         
-        return service
\ No newline at end of file
+        return service
+
+@st.cache_resource
+def get_drive_credentials():
+    # Credenciais compartilhadas por todas as sessões
+    return GoogleDriveService().credentials()
+
+@st.cache_resource
+def get_drive_service():
+    # Serviço criado uma única vez e compartilhado por todas as sessões
+    return GoogleDriveService().build()
+
+def authorized_http():
+    # O httplib2 não é thread-safe: cada download paralelo usa seu próprio cliente HTTP
+    return google_auth_httplib2.AuthorizedHttp(get_drive_credentials(), http=httplib2.Http())